@@ -1,8 +1,21 @@
 import numpy as np
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+def set_batch_mode():
+    '''
+    Switch to the non-interactive 'Agg' backend and turn plt.show() into a no-op,
+    for saving plots in loops or headless runs without displaying them.
+
+    Returns:
+    - None
+    '''
+    matplotlib.use('Agg')
+    plt.show = lambda *args, **kwargs: None
+
+
 def plot_hist(data, variable, bins=50, save=False, lims=(-40, 40), figsize=(5, 5), output_dir='./'):
     '''
     Plot a histogram for the given variable.
@@ -26,11 +39,14 @@ def plot_hist(data, variable, bins=50, save=False, lims=(-40, 40), figsize=(5, 5
     '''
     fig, ax = plt.subplots(figsize=figsize)
     
-    # Remove rows with missing values
-    data = data.dropna(subset=[variable])
+    # Keep finite values within the limits, using a single mask
+    values = data[variable].to_numpy()
+    mask = np.isfinite(values) & (values >= lims[0]) & (values <= lims[1])
     
-    # Create histogram
-    n, bins, patches = ax.hist(data[variable][(data[variable] <= lims[1]) & (data[variable] >= lims[0])], bins=bins, color='lightblue', edgecolor='white')
+    # Create histogram (binned with NumPy, drawn as bars)
+    edges = np.linspace(lims[0], lims[1], bins + 1)
+    counts, _ = np.histogram(values[mask], bins=edges)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='lightblue', edgecolor='white')
     
     # Customize spines, ticks, and grid lines
     ax.spines['top'].set_visible(False)
@@ -50,9 +66,10 @@ def plot_hist(data, variable, bins=50, save=False, lims=(-40, 40), figsize=(5, 5
     fig.tight_layout()
     
     if save:
-        plt.savefig(output_dir + f'{variable}_histogram.pdf')
+        plt.savefig(output_dir + f'{variable}_histogram.pdf', dpi=100)
     
     plt.show()
+    plt.close(fig)
 
 
 def plot_hist_by_group(data, variable, group_variable, bins=50, save=False, lims=(-40, 40), figsize=(10, 6), output_dir='./'):
@@ -80,15 +97,19 @@ def plot_hist_by_group(data, variable, group_variable, bins=50, save=False, lims
     '''
     fig, ax = plt.subplots(figsize=figsize)
 
-    # Remove rows with missing values
-    data = data.dropna(subset=[variable, group_variable])
+    # Keep finite values within the limits and with a defined group, using a single mask
+    values = data[variable].to_numpy()
+    groups = data[group_variable].to_numpy()
+    mask = np.isfinite(values) & (values >= lims[0]) & (values <= lims[1]) & pd.notna(groups)
+
+    # Common bin edges, so every group lands on the same bin boundaries
+    edges = np.linspace(lims[0], lims[1], bins + 1)
 
     # Group by the specified variable (e.g., 'stock_id') and plot histograms
-    for group_name, group_data in data.groupby(group_variable):
+    for group_name, group_values in pd.Series(values[mask]).groupby(groups[mask]):
         # Create histogram
-        n, bins, patches = ax.hist(
-            group_data[variable][(group_data[variable] <= lims[1]) & (group_data[variable] >= lims[0])],
-            bins=bins, alpha=0.5, label=f'{group_variable}={group_name}')
+        counts, _ = np.histogram(group_values.to_numpy(), bins=edges)
+        ax.stairs(counts, edges, fill=True, alpha=0.5, label=f'{group_variable}={group_name}')
 
     # Customize spines, ticks, and grid lines
     ax.spines['top'].set_visible(False)
@@ -109,9 +130,10 @@ def plot_hist_by_group(data, variable, group_variable, bins=50, save=False, lims
     fig.tight_layout()
 
     if save:
-        plt.savefig(output_dir + f'{variable}_by_{group_variable}_histograms.pdf')
+        plt.savefig(output_dir + f'{variable}_by_{group_variable}_histograms.pdf', dpi=100)
 
     plt.show()
+    plt.close(fig)
 
 
 def plot_bar_chart(data, variable, save=False, figsize=(5, 5), output_dir='./'):
@@ -173,9 +195,10 @@ def plot_bar_chart(data, variable, save=False, figsize=(5, 5), output_dir='./'):
     fig.tight_layout()
 
     if save:
-        plt.savefig(output_dir + f'{variable}_value_dist.pdf')
+        plt.savefig(output_dir + f'{variable}_value_dist.pdf', dpi=100)
 
     plt.show()
+    plt.close(fig)
 
 
 def plot_box(data, variable, save=False, figsize=(5, 5), output_dir='./'):
@@ -242,9 +265,10 @@ def plot_box(data, variable, save=False, figsize=(5, 5), output_dir='./'):
 
     fig.tight_layout()
 
-    if save: plt.savefig(output_dir + f'{variable}_box_plot.pdf')
+    if save: plt.savefig(output_dir + f'{variable}_box_plot.pdf', dpi=100)
 
     plt.show()
+    plt.close(fig)
 
 
 def plot_violin(data, variable, save=False, figsize=(5, 5), output_dir='./'):
@@ -269,21 +293,16 @@ def plot_violin(data, variable, save=False, figsize=(5, 5), output_dir='./'):
     # Create violin plot
     violinplot = sns.violinplot(x=data[variable].dropna(), ax=ax, color='lightblue', inner='quartile')
 
+    collections = violinplot.collections
+    lines = violinplot.lines
+
     # Customize violin plot
-    for patch in violinplot.collections:
+    for patch in collections:
         patch.set_facecolor('lightblue')
         patch.set_edgecolor('gray')
         patch.set_alpha(0.5)
 
-    for line in violinplot.lines:
-        line.set_color('#7570b3')
-        line.set_linewidth(2)
-
-    for line in violinplot.lines:
-        line.set_color('#7570b3')
-        line.set_linewidth(2)
-
-    for line in violinplot.lines:
+    for line in lines:
         line.set_color('blue')
         line.set_linewidth(1)
 
@@ -305,9 +324,10 @@ def plot_violin(data, variable, save=False, figsize=(5, 5), output_dir='./'):
     fig.tight_layout()
 
     if save:
-        plt.savefig(output_dir + f'{variable}_violin_plot.pdf')
+        plt.savefig(output_dir + f'{variable}_violin_plot.pdf', dpi=100)
 
     plt.show()
+    plt.close(fig)
     
 
 def plot_missing_values(data, save=False, figsize=(10, 5), output_dir='./'):
@@ -325,8 +345,8 @@ def plot_missing_values(data, save=False, figsize=(10, 5), output_dir='./'):
     Returns:
     - None
     """
-    # Calculate the percentage of missing values in each column
-    missing_values = data.isnull().sum()
+    # Calculate the percentage of missing values in each column (count() avoids a full boolean mask)
+    missing_values = len(data) - data.count()
     missing_percentage = (missing_values / len(data)) * 100
 
     # Filter out columns with no missing values
@@ -372,6 +392,7 @@ def plot_missing_values(data, save=False, figsize=(10, 5), output_dir='./'):
     plt.tight_layout()
 
     if save:
-        plt.savefig(output_dir + 'missing_values.pdf')
+        plt.savefig(output_dir + 'missing_values.pdf', dpi=100)
 
-    plt.show()
\ No newline at end of file
+    plt.show()
+    plt.close(fig)
\ No newline at end of file
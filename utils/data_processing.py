@@ -1,5 +1,55 @@
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+
+# Copy-on-Write avoids pandas silently duplicating blocks on column assignment
+pd.options.mode.copy_on_write = True
+
+def _safe_divide(numerator, denominator):
+    """
+    Divide element-wise, returning 0 wherever the denominator is 0 or not finite (e.g., NaN).
+
+    Parameters:
+    - numerator: numpy array
+        The dividend values.
+    - denominator: numpy array
+        The divisor values, with the same shape as the numerator.
+
+    Returns:
+    - numpy array
+        The element-wise quotient, with at least float32 precision.
+    """
+    out = np.zeros(numerator.shape, dtype=np.result_type(numerator.dtype, np.float32))
+    return np.divide(numerator, denominator, out=out, where=np.isfinite(denominator) & (denominator != 0))
+
+
+def _feature_kernel(bid_size, ask_size, imbalance_size, matched_size, ask_price, bid_price):
+    """
+    Compute the engineered features with vectorized operations over the raw NumPy columns.
+
+    Parameters:
+    - bid_size, ask_size: numpy arrays
+        The bid and ask sizes.
+    - imbalance_size, matched_size: numpy arrays
+        The auction imbalance and matched sizes.
+    - ask_price, bid_price: numpy arrays
+        The ask and bid prices.
+
+    Returns:
+    - tuple of numpy arrays
+        liquidity_imbalance, matched_imbalance, price_spread and market_urgency.
+    """
+    # Ratios are set to 0 in case of division by 0 or missing sizes
+    liquidity_imbalance = _safe_divide(bid_size - ask_size, bid_size + ask_size)
+    matched_imbalance = _safe_divide(imbalance_size - matched_size, matched_size + imbalance_size)
+
+    # Replace 'NaN' with 0, in case of missing prices
+    price_spread = ask_price - bid_price
+    price_spread[np.isnan(price_spread)] = 0
+    market_urgency = price_spread * liquidity_imbalance
+
+    return liquidity_imbalance, matched_imbalance, price_spread, market_urgency
+
 
 def feature_engineering(X):
     """
@@ -13,29 +63,34 @@ def feature_engineering(X):
     - pandas DataFrame
         The DataFrame with additional engineered features.
     """
-    # Create a copy of the input DataFrame to avoid modifying the original
-    _X = X.copy()
-
-    _X["liquidity_imbalance"] = _X.eval("(bid_size-ask_size)/(bid_size+ask_size)")
-    _X["matched_imbalance"] = _X.eval("(imbalance_size-matched_size)/(matched_size+imbalance_size)")
-    _X["price_spread"] = _X["ask_price"] - _X["bid_price"]
-    _X['market_urgency'] = _X['price_spread'] * _X['liquidity_imbalance']
+    liquidity_imbalance, matched_imbalance, price_spread, market_urgency = _feature_kernel(
+        X['bid_size'].to_numpy(),
+        X['ask_size'].to_numpy(),
+        X['imbalance_size'].to_numpy(),
+        X['matched_size'].to_numpy(),
+        X['ask_price'].to_numpy(),
+        X['bid_price'].to_numpy())
 
-    # Replace 'NaN' with 0, in case of division by 0
-    _X.fillna(0, inplace=True)
+    # Add the new features, overwriting them if already present (X is left unmodified;
+    # with Copy-on-Write the original columns are not copied)
+    return X.assign(liquidity_imbalance=liquidity_imbalance,
+                    matched_imbalance=matched_imbalance,
+                    price_spread=price_spread,
+                    market_urgency=market_urgency)
 
-    return _X
 
-
-def data_preprocessing(data, remove_missing=False):
+def data_preprocessing(data, remove_missing=False, one_hot=False):
     """
-    Preprocess the input data by handling missing values and performing one-hot encoding.
+    Preprocess the input data by handling missing values and encoding 'imbalance_buy_sell_flag'.
 
     Parameters:
     - data: pandas DataFrame
         The input DataFrame containing the data.
     - remove_missing: bool, optional (default=False)
         If True, remove all rows with missing values.
+    - one_hot: bool, optional (default=False)
+        If True, one-hot encode 'imbalance_buy_sell_flag' (e.g., for linear models).
+        Otherwise keep it as a single int8 categorical column (e.g., for tree models).
 
     Returns:
     - DataFrame
@@ -50,23 +105,48 @@ def data_preprocessing(data, remove_missing=False):
         data['far_price']  = data['far_price'].fillna(0)
         data['near_price'] = data['near_price'].fillna(0)
 
-        # Identify columns with missing values
-        columns_with_missing = data.columns[data.isnull().any()]
-
         # Replace remaining missing values with variable median distribution
-        for column in columns_with_missing:
-            median_value = data[column].median()
-            data[column] = data[column].fillna(median_value)
+        data = data.fillna(data.median(numeric_only=True))
 
-    # One-hot encode categorical variable 'imbalance_buy_sell_flag'
-    data = pd.get_dummies(data, columns=['imbalance_buy_sell_flag'], prefix='imbalance_flag')
+    if one_hot:
+        # One-hot encode categorical variable 'imbalance_buy_sell_flag'
+        data = pd.get_dummies(data, columns=['imbalance_buy_sell_flag'], prefix='imbalance_flag', dtype=np.uint8)
 
-    # Rename the column 'imbalance_flag_-1' to 'imbalance_flag_neg_1' for readability
-    data = data.rename(columns={'imbalance_flag_-1': 'imbalance_flag_neg_1'})
+        # Rename the column 'imbalance_flag_-1' to 'imbalance_flag_neg_1' for readability
+        data = data.rename(columns={'imbalance_flag_-1': 'imbalance_flag_neg_1'})
+
+    else:
+        # Keep 'imbalance_buy_sell_flag' as a single integer-coded categorical column
+        data['imbalance_buy_sell_flag'] = data['imbalance_buy_sell_flag'].astype('int8')
     
     return data
     
 
+def _within_bounds(values, sigma):
+    """
+    Flag the rows whose values all lie within sigma standard deviations of their column mean.
+
+    Parameters:
+    - values: 2D numpy array
+        The data, one column per variable.
+    - sigma: int
+        The number of standard deviations used to define the bounds for extreme values.
+
+    Returns:
+    - numpy array of bool
+        True for the rows to keep. With fewer than 2 rows the standard deviation
+        is undefined, so no row is kept.
+    """
+    if len(values) < 2:
+        return np.zeros(len(values), dtype=bool)
+
+    # Column-wise mean and standard deviation (ddof=1 to match pandas' std)
+    mean_values = np.nanmean(values, axis=0)
+    std_values = np.nanstd(values, axis=0, ddof=1)
+
+    return np.all(np.abs(values - mean_values) <= sigma * std_values, axis=1)
+
+
 def remove_extreme_values(dataframe, columns, sigma=4):
     """
     Remove data points that are 4 standard deviations away from the mean in specified columns.
@@ -84,29 +164,53 @@ def remove_extreme_values(dataframe, columns, sigma=4):
         A new DataFrame with extreme values removed from the specified columns.
     """
 
-    # Copy the original DataFrame to avoid imputating original data
-    df_copy = dataframe.copy()
+    # Keep rows whose values all lie within the bounds, with a single mask
+    mask = _within_bounds(dataframe[columns].to_numpy(), sigma)
 
-    # Identify count variables by '_size' suffix
-    count_variables = [column for column in columns if '_size' in column]
+    # Boolean indexing returns a new DataFrame, leaving the original data untouched
+    return dataframe.loc[mask]
 
-    # Apply square root transformation to count variables (helps with skewness)
-    # for var in count_variables:
-    #    df_copy[var] = np.sqrt(df_copy[var])
-    
-    # Iterate over each column and remove extreme values
-    for column in columns:
-        mean_value = df_copy[column].mean()
-        std_value = df_copy[column].std()
 
-        # Lower and upper bounds for extreme values
-        lower_bound = mean_value - sigma * std_value
-        upper_bound = mean_value + sigma * std_value
+def remove_extreme_values_by_group(dataframe, group_column, columns, sigma=4, n_jobs=-1):
+    """
+    Remove data points that are sigma standard deviations away from their group's mean in specified columns.
+
+    Parameters:
+    - dataframe: pandas DataFrame
+        The input DataFrame containing the data.
+    - group_column: str
+        The column by which data is grouped (e.g., 'stock_id').
+    - columns: list of column names
+        The list of column names in which extreme values will be removed.
+    - sigma: int, optional (default=4)
+        The number of standard deviations used to define the bounds for extreme values.
+    - n_jobs: int, optional (default=-1)
+        The number of parallel threads (-1 uses all available cores).
+
+    Returns:
+    - DataFrame
+        A new DataFrame with extreme values removed from the specified columns, within each group,
+        with the remaining rows in their original order. Rows with a missing group value form
+        their own group; groups with a single row are always removed (undefined standard deviation).
+    """
+    if dataframe.empty:
+        return dataframe.iloc[:0]
+
+    values = dataframe[columns].to_numpy()
+    group_positions = list(dataframe.groupby(group_column, dropna=False).indices.values())
+
+    # Groups are independent, so each one is masked in parallel. Threads avoid pickling
+    # the groups to worker processes, and NumPy releases the GIL during the mask computation
+    group_masks = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(_within_bounds)(values[positions], sigma) for positions in group_positions
+    )
 
-        # Remove rows with values outside the bounds
-        df_copy = df_copy[(df_copy[column] >= lower_bound) & (df_copy[column] <= upper_bound)]
+    # Combine the group masks by row position, so the input row order is preserved
+    mask = np.zeros(len(dataframe), dtype=bool)
+    for positions, group_mask in zip(group_positions, group_masks):
+        mask[positions[group_mask]] = True
 
-    return df_copy
+    return dataframe.iloc[mask]
 
 def split_data(data, n):
     """
@@ -122,6 +226,49 @@ def split_data(data, n):
     - tuple of DataFrames
         A tuple containing the training and test sets.
     """
-    train = data[data['date_id'] < n]
-    test = data[data['date_id'] >= n]
-    return train, test
\ No newline at end of file
+    date_ids = data['date_id']
+
+    # Rows are usually ordered by date, so the split point can be found by binary search
+    if date_ids.is_monotonic_increasing:
+        split_index = np.searchsorted(date_ids.to_numpy(), n, side='left')
+        return data.iloc[:split_index], data.iloc[split_index:]
+
+    train = data[date_ids < n]
+    test = data[date_ids >= n]
+    return train, test
+
+def summary_statistics(data, sample_frac=0.01, min_sample_size=10_000, random_state=0):
+    """
+    Compute summary statistics of the numerical columns, in the layout of DataFrame.describe().
+
+    Count, mean, std, min and max are exact. On large frames the quartiles are approximated
+    on a random sample, in which case their rows are labelled '25% (approx.)', etc.
+
+    Parameters:
+    - data: pandas DataFrame
+        The input DataFrame containing the data.
+    - sample_frac: float, optional (default=0.01)
+        The fraction of rows sampled to approximate the quartiles.
+    - min_sample_size: int, optional (default=10_000)
+        If the sample would be smaller than this, the quartiles are computed exactly on all rows.
+    - random_state: int, optional (default=0)
+        The seed used to draw the sample.
+
+    Returns:
+    - DataFrame
+        The count, mean, std, min, quartiles and max of each numerical column.
+    """
+    numerical_data = data.select_dtypes('number').astype('float32', copy=False)
+
+    # Moments and extremes over the full data
+    summary = numerical_data.agg(['count', 'mean', 'std', 'min', 'max'])
+
+    # Quartiles require sorting, so on large frames they are approximated on a random sample
+    if len(numerical_data) * sample_frac >= min_sample_size:
+        quartiles = numerical_data.sample(frac=sample_frac, random_state=random_state).quantile([0.25, 0.5, 0.75])
+        quartiles.index = ['25% (approx.)', '50% (approx.)', '75% (approx.)']
+    else:
+        quartiles = numerical_data.quantile([0.25, 0.5, 0.75])
+        quartiles.index = ['25%', '50%', '75%']
+
+    return pd.concat([summary.loc[['count', 'mean', 'std', 'min']], quartiles, summary.loc[['max']]])
@@ -0,0 +1,147 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Compact dtypes for the Optiver 'train.csv' schema
+DTYPES = {
+    'stock_id': 'int16',
+    'date_id': 'int16',
+    'seconds_in_bucket': 'int16',
+    'imbalance_size': 'float32',
+    'imbalance_buy_sell_flag': 'int8',
+    'reference_price': 'float32',
+    'matched_size': 'float32',
+    'far_price': 'float32',
+    'near_price': 'float32',
+    'bid_price': 'float32',
+    'bid_size': 'float32',
+    'ask_price': 'float32',
+    'ask_size': 'float32',
+    'wap': 'float32',
+    'target': 'float32',
+    'time_id': 'int32',
+}
+
+def load_train(path):
+    """
+    Load the Optiver training data with downcast dtypes.
+
+    Parameters:
+    - path: str
+        The path to the 'train.csv' file.
+
+    Returns:
+    - pandas DataFrame
+        The training data, with 16/32-bit integer and 32-bit float columns.
+    """
+    return pd.read_csv(path, dtype=DTYPES, engine='c')
+
+
+def save_frame(df, path):
+    """
+    Save a DataFrame to a zstd-compressed Parquet file.
+
+    Parameters:
+    - df: pandas DataFrame
+        The DataFrame to be saved.
+    - path: str
+        The path to the output '.parquet' file.
+
+    Returns:
+    - None
+    """
+    df.to_parquet(path, compression='zstd', engine='pyarrow')
+
+
+def load_frame(path, columns=None):
+    """
+    Load a DataFrame saved with save_frame.
+
+    Parameters:
+    - path: str
+        The path to the '.parquet' file.
+    - columns: list of column names, optional (default=None)
+        If given, only these columns are read from disk.
+
+    Returns:
+    - pandas DataFrame
+        The loaded DataFrame, with the dtypes it was saved with.
+    """
+    return pd.read_parquet(path, columns=columns, engine='pyarrow')
+
+
+def load_train_cached(csv_path, cache_path):
+    """
+    Load the Optiver training data from a Parquet cache, rebuilding it from the CSV when needed.
+
+    The cache is rebuilt when it does not exist, when the CSV is newer than it,
+    when its columns differ from the CSV header, or when its dtypes no longer match DTYPES.
+
+    Parameters:
+    - csv_path: str
+        The path to the 'train.csv' file.
+    - cache_path: str
+        The path to the '.parquet' cache file.
+
+    Returns:
+    - pandas DataFrame
+        The training data, with the dtypes given by DTYPES.
+    """
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(csv_path):
+        data = load_frame(cache_path)
+
+        # Reuse the cache only if it has the CSV's columns and was written with the current DTYPES
+        same_columns = list(data.columns) == list(pd.read_csv(csv_path, nrows=0).columns)
+        same_dtypes = all(str(dtype) == DTYPES[column] for column, dtype in data.dtypes.items() if column in DTYPES)
+
+        if same_columns and same_dtypes:
+            return data
+
+    data = load_train(csv_path)
+    save_frame(data, cache_path)
+
+    return data
+
+
+def streaming_describe(path, chunksize=500_000):
+    """
+    Compute summary statistics of the numerical columns of a CSV file, reading it in chunks.
+
+    Parameters:
+    - path: str
+        The path to the '.csv' file.
+    - chunksize: int, optional (default=500_000)
+        The number of rows read at a time.
+
+    Returns:
+    - pandas DataFrame
+        The count, mean, std, min and max of each numerical column.
+    """
+    count = shifted_sum = shifted_sum_sq = minimum = maximum = shift = None
+
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=DTYPES, engine='c'):
+        numerical_chunk = chunk.select_dtypes('number').astype('float64')
+
+        # Sums are taken around the first chunk's mean, to keep the variance numerically stable
+        if shift is None:
+            shift = numerical_chunk.mean().fillna(0)
+
+        centered_chunk = numerical_chunk - shift
+
+        # Partial aggregates are additive, so they can be merged chunk by chunk
+        partial = [numerical_chunk.count(), centered_chunk.sum(), (centered_chunk ** 2).sum(),
+                   numerical_chunk.min(), numerical_chunk.max()]
+
+        if count is None:
+            count, shifted_sum, shifted_sum_sq, minimum, maximum = partial
+        else:
+            count = count + partial[0]
+            shifted_sum = shifted_sum + partial[1]
+            shifted_sum_sq = shifted_sum_sq + partial[2]
+            minimum = np.fmin(minimum, partial[3])
+            maximum = np.fmax(maximum, partial[4])
+
+    mean = shift + shifted_sum / count
+    std = np.sqrt((shifted_sum_sq - shifted_sum ** 2 / count) / (count - 1))
+
+    return pd.DataFrame({'count': count, 'mean': mean, 'std': std, 'min': minimum, 'max': maximum}).T
@@ -1,47 +1,106 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from tabulate import tabulate
 # For GLM models
 import statsmodels.api as sm
 from statsmodels.stats.diagnostic import lilliefors
-from scipy.stats import probplot
-from sklearn.metrics import mean_absolute_error
+from scipy.stats import probplot, zscore
 
-def display_anova_table(model):
+def _is_number(cell):
+    """
+    Check whether a table cell holds a number (or a string that parses as one).
+
+    Parameters:
+    - cell: any
+        The table cell.
+
+    Returns:
+    - bool
+        True if the cell is numeric.
+    """
+    try:
+        float(cell)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _format_table(table_data, headers):
+    """
+    Format rows as a plain-text table with fixed-width columns.
+    Numeric columns are right-aligned, the others left-aligned.
+
+    Parameters:
+    - table_data: list of lists
+        The table rows, one list of cells per row.
+    - headers: list of str
+        The column names.
+
+    Returns:
+    - str
+        The formatted table.
+    """
+    rows = [headers] + table_data
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(headers))]
+
+    # A column is numeric if all of its non-empty cells are numbers
+    alignments = ['>' if all(_is_number(row[i]) for row in table_data if row[i] != '') else '<'
+                  for i in range(len(headers))]
+
+    lines = [' | '.join(f'{str(cell):{alignment}{width}}' for cell, alignment, width in zip(row, alignments, widths))
+             for row in rows]
+    lines.insert(1, '-+-'.join('-' * width for width in widths))
+
+    return '\n'.join(lines)
+
+
+def display_anova_table(model, anova_table=None):
     """
     Display the ANOVA table for the given model.
 
     Parameters:
     - model: statsmodels regression model
         The fitted regression model.
+    - anova_table: pandas DataFrame, optional (default=None)
+        A precomputed sm.stats.anova_lm(model) result, to avoid recomputing it
+        (e.g., when also calling find_highest_p_value). Computed if not given.
 
     Returns:
     None
     """
-    anova_table = sm.stats.anova_lm(model)
+    if anova_table is None:
+        anova_table = sm.stats.anova_lm(model)
 
     # Extract relevant information
     source_info = anova_table.iloc[:-1, :]
     total_info = anova_table.iloc[-1, :]
 
+    names = source_info.index.to_numpy()
+    df_values = source_info['df'].to_numpy()
+    sum_sq_values = source_info['sum_sq'].to_numpy()
+    f_values = source_info['F'].to_numpy()
+    p_values = source_info['PR(>F)'].to_numpy()
+
+    error_df = total_info['df']
+    error_sum_sq = total_info['sum_sq']
+
+    # Totals over all sources plus the error term
+    total_df = error_df + df_values.sum()
+    total_sum_sq = error_sum_sq + sum_sq_values.sum()
+
     # Display the ANOVA table in a formatted way
     print("Analysis of Variance Table\n")
     headers = ["Source", "Df", "SS", "MS", "F", "PR(>F)"]
     table_data = []
 
-    for index, row in source_info.iterrows():
-        table_data.append([index, int(row['df']), int(row['sum_sq']), int(row['sum_sq'] / row['df']),
-                           round(row['F'], 1), format(row['PR(>F)'], ".2e")])
+    for i in range(len(names)):
+        table_data.append([names[i], int(df_values[i]), int(sum_sq_values[i]), int(sum_sq_values[i] / df_values[i]),
+                           round(f_values[i], 1), format(p_values[i], ".2e")])
+
+    table_data.append(["Error", int(error_df), int(error_sum_sq), int(error_sum_sq / error_df), "", ""])
 
-    table_data.append(["Error", int(total_info['df']), int(total_info['sum_sq']),
-                       int(total_info['sum_sq'] / total_info['df']), "", ""])
-    
-    table_data.append(["Total", int(total_info['df'] + source_info['df'].sum()),
-                       int(total_info['sum_sq'] + source_info['sum_sq'].sum()),
-                       int((total_info['sum_sq'] + source_info['sum_sq'].sum()) / 
-                           (total_info['df'] + source_info['df'].sum())), "", ""])
+    table_data.append(["Total", int(total_df), int(total_sum_sq), int(total_sum_sq / total_df), "", ""])
 
-    print(tabulate(table_data, headers=headers, tablefmt="pretty"))
+    print(_format_table(table_data, headers))
 
 
 def residuals_analysis(residuals):
@@ -56,10 +115,10 @@ def residuals_analysis(residuals):
     None
     """
     # Normalize the residuals
-    normalized_residuals = (residuals - np.mean(residuals)) / np.std(residuals)
+    normalized_residuals = zscore(residuals, nan_policy='omit')
 
     # Create a custom grid for subplots
-    plt.figure(figsize=(10, 8))
+    fig = plt.figure(figsize=(10, 8))
     grid = plt.GridSpec(2, 2, wspace=0.4, hspace=0.3)
 
     # Plot histogram on the top left subplot
@@ -94,20 +153,25 @@ def residuals_analysis(residuals):
     print(f"P-value: {lilliefors_p_value}")
 
     plt.show()
+    plt.close(fig)
 
 
-def find_highest_p_value(model):
+def find_highest_p_value(model, anova_table=None):
     """
     Find the variable with the highest p-value in the ANOVA table.
 
     Parameters:
     - model: statsmodels regression model
         The fitted regression model.
+    - anova_table: pandas DataFrame, optional (default=None)
+        A precomputed sm.stats.anova_lm(model) result, to avoid recomputing it
+        (e.g., when also calling display_anova_table). Computed if not given.
 
     Returns:
     None
     """
-    anova_table = sm.stats.anova_lm(model)
+    if anova_table is None:
+        anova_table = sm.stats.anova_lm(model)
 
     # Exclude the last row (Total)
     source_info = anova_table.iloc[:-1, :]
@@ -143,10 +207,10 @@ def prediction_residuals_and_errors(model, X_test, y_test):
     residuals = y_pred - y_test
 
     # Normalize residuals
-    normalized_residuals = (residuals - np.mean(residuals)) / np.std(residuals)
+    normalized_residuals = zscore(residuals, nan_policy='omit')
 
     # Custom grid for subplots
-    plt.figure(figsize=(12, 6))
+    fig = plt.figure(figsize=(12, 6))
     grid = plt.GridSpec(1, 2, wspace=0.4)
 
     # Scatter plot on the left subplot
@@ -165,11 +229,15 @@ def prediction_residuals_and_errors(model, X_test, y_test):
     plt.ylabel('Normalized Residuals (Squared)')
 
     plt.show()
+    plt.close(fig)
+
+    # Both error metrics are reductions over the residuals computed above
+    diff = np.asarray(residuals)
 
     # Mean Absolute Error
-    mae = mean_absolute_error(y_test, y_pred)
+    mae = np.abs(diff).mean()
     print(f"Mean Absolute Error: {mae:.4f}")
 
     # Squared Error
-    squared_error = np.mean((y_pred - y_test)**2)
+    squared_error = (diff * diff).mean()
     print(f"Mean Squared Error:  {squared_error:.4f}")
\ No newline at end of file